@@ -8,11 +8,25 @@
  * para divergir.
  *
  * A função principal (calculate_mandelbrot) é exportada com linkagem C
- * para ser chamada pelo Python via ctypes.
+ * para ser chamada pelo Python via ctypes. A variante calculate_mandelbrot_rgb
+ * já devolve a imagem colorida, aplicando uma tabela de cores por iteração.
+ *
+ * Em processadores x86 com AVX2/FMA (ou AVX-512) cada linha é calculada
+ * com instruções SIMD, 4 (ou 8) pixels por vez. A escolha do kernel é
+ * feita uma única vez, ao carregar a biblioteca, consultando a CPU
+ * (CPUID); nas demais CPUs é usado o laço escalar. As variantes _f32
+ * iteram em precisão simples, com o dobro de pixels por registro, e as
+ * variantes _perturbed usam perturbação em torno de uma órbita de
+ * referência, para zooms profundos.
+ *
+ * As linhas são distribuídas entre os núcleos com OpenMP (-fopenmp).
  *
  * Compilação:
- *   Linux  : g++ -O2 -shared -fPIC -o main.so main.cpp
- *   Windows: g++ -O2 -shared -static -o main.dll main.cpp
+ *   Linux  : g++ -O3 -march=native -ffast-math -funroll-loops -fopenmp -fPIC -c -o main.o main.cpp
+ *            g++ -fopenmp -shared -o main.so main.o
+ *   Windows: g++ -O3 -march=native -ffast-math -funroll-loops -fopenmp -c -o main.o main.cpp
+ *            g++ -fopenmp -shared -static -o main.dll main.o
+ *   (-ffast-math não pode ir para a ligação: ver Makefile)
  *   Ou simplesmente: make
  */
 
@@ -21,6 +35,15 @@
 #include <algorithm>
 #include <array>
 #include <cmath>
+#include <cstdint>
+#include <cstddef>
+
+#if (defined(__x86_64__) || defined(__i386__)) && defined(__GNUC__)
+    #define HAS_X86_SIMD 1
+    #include <immintrin.h>
+#else
+    #define HAS_X86_SIMD 0
+#endif
 
 #ifdef _WIN32
     #define EXPORT extern "C" __declspec(dllexport)
@@ -28,6 +51,24 @@
     #define EXPORT extern "C"
 #endif
 
+/**
+ * @brief coordenada do pixel idx no eixo: origin + idx * step.
+ *
+ * a conta é feita sem contração em FMA, como no Python. com -march=native
+ * o GCC a fundiria num FMA e a linha do eixo real (onde idx * step cancela
+ * origin) ganharia uma parte imaginária residual, tirando do conjunto
+ * pontos da antena entre -2 e -1.4.
+ */
+#if defined(__GNUC__) && !defined(__clang__)
+__attribute__((optimize("fp-contract=off")))
+#endif
+static double pixel_coord(double origin, int idx, double step) {
+#if defined(__clang__)
+  #pragma clang fp contract(off)
+#endif
+  return origin + idx * step;
+}
+
 /**
  * @brief calcula o número de iterações do conjunto de Mandelbrot para um
  *        ponto c = (real + imag*i) no plano complexo.
@@ -36,12 +77,22 @@
  * retorna o número da iteração em que |z| > 2 (condição de escape)
  * ou max_iter caso o ponto não divirja dentro do limite.
  *
+ * pontos da cardioide principal e do bulbo de período 2 nunca divergem;
+ * um teste algébrico barato os identifica e devolve max_iter sem iterar.
+ *
  * @param real     parte real de c.
  * @param imag     parte imaginária de c.
  * @param max_iter número máximo de iterações.
  * @return         iteração de escape ou max_iter.
  */
 static int mandelbrot(double real, double imag, int max_iter) {
+  double xm = real - 0.25;
+  double q  = xm*xm + imag*imag;
+  if (q*(q + xm) < 0.25*imag*imag)                            // cardioide
+      return max_iter;
+  if ((real + 1.0)*(real + 1.0) + imag*imag < 0.0625)         // bulbo de período 2
+      return max_iter;
+
   double zr = 0;
   double zi = 0;
   int iter;
@@ -61,10 +112,502 @@ static int mandelbrot(double real, double imag, int max_iter) {
   return max_iter;
 }
 
+/**
+ * @brief assinatura comum dos kernels que calculam uma linha da imagem.
+ * @param row       início da linha no buffer de saída (width inteiros de 32 bits).
+ * @param width     largura da linha em pixels.
+ * @param minReal   limite inferior do eixo real.
+ * @param realStep  distância entre pixels no eixo real.
+ * @param imag      parte imaginária (constante na linha).
+ * @param max_iter  número máximo de iterações por ponto.
+ */
+typedef void (*row_kernel_fn)(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter);
+
+/**
+ * @brief kernel escalar (double ou float) para CPUs sem AVX2.
+ *
+ * em vez de iterar um pixel até escapar, itera um bloco de LANES pixels
+ * em passo fixo com uma máscara de "ainda ativo", como os kernels SIMD.
+ * o corpo do laço interno não tem desvios (a máscara é multiplicada pelo
+ * resultado do teste de escape) e o omp simd pede ao compilador que o
+ * vetorize sozinho (confira com make vecinfo); o bloco termina quando
+ * nenhum pixel continua ativo.
+ */
+template <typename T>
+static void mandelbrot_row_lanes(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter) {
+  const int LANES = 8;
+  const T ci = (T)imag;
+
+  for(int j = 0; j < width; j += LANES) {
+    // máscara e contagem no mesmo tipo de T, para o laço interno ficar homogêneo
+    T cr[LANES], zr[LANES], zi[LANES], n[LANES], active[LANES];
+
+    for(int k = 0; k < LANES; k++) {
+      cr[k] = (T)pixel_coord(minReal, j + k, realStep);
+      zr[k] = 0;
+      zi[k] = 0;
+
+      // cardioide e bulbo de período 2; lanes além da largura ficam inativas
+      T xm = cr[k] - (T)0.25;
+      T q  = xm*xm + ci*ci;
+      bool interior = q*(q + xm) < (T)0.25*ci*ci ||
+                      (cr[k] + 1)*(cr[k] + 1) + ci*ci < (T)0.0625;
+      active[k] = (!interior && j + k < width) ? 1 : 0;
+      n[k]      = interior ? (T)max_iter : 0;
+    }
+
+    for(int iter = 0; iter < max_iter; iter++) {
+      T any = 0;
+      #pragma omp simd reduction(+:any)
+      for(int k = 0; k < LANES; k++) {
+        T new_zr = zr[k]*zr[k] - zi[k]*zi[k] + cr[k];
+        T new_zi = 2*zr[k]*zi[k] + ci;
+        zr[k] = new_zr;
+        zi[k] = new_zi;
+
+        active[k] *= (T)(zr[k]*zr[k] + zi[k]*zi[k] <= 4);
+        n[k]     += active[k];
+        any      += active[k];
+      }
+      if(any == 0)
+        break;
+    }
+
+    for(int k = 0; k < LANES && j + k < width; k++)
+      row[j + k] = (int32_t)n[k];
+  }
+}
+
+#if HAS_X86_SIMD
+/**
+ * @brief kernel AVX2/FMA: 4 pixels consecutivos por registro __m256d.
+ *
+ * cada lane conta as iterações em que continua dentro do raio de escape,
+ * o que reproduz exatamente o retorno de mandelbrot(). lanes na cardioide
+ * ou no bulbo de período 2 já começam inativas e recebem max_iter; o laço
+ * termina assim que as 4 lanes estão inativas (movemask == 0).
+ */
+__attribute__((target("avx2,fma")))
+static void mandelbrot_row_avx2(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter) {
+  const __m256d four = _mm256_set1_pd(4.0);
+  const __m256d one  = _mm256_set1_pd(1.0);
+  const __m256d ci   = _mm256_set1_pd(imag);
+  const __m256d ci2  = _mm256_mul_pd(ci, ci);
+  const __m256d maxv = _mm256_set1_pd((double)max_iter);
+
+  int j = 0;
+  for(; j + 4 <= width; j += 4) {
+    __m256d cr = _mm256_set_pd(pixel_coord(minReal, j + 3, realStep), pixel_coord(minReal, j + 2, realStep),
+                               pixel_coord(minReal, j + 1, realStep), pixel_coord(minReal, j, realStep));
+    __m256d zr = _mm256_setzero_pd();
+    __m256d zi = _mm256_setzero_pd();
+    __m256d n  = _mm256_setzero_pd();
+
+    // cardioide e bulbo de período 2
+    __m256d xm = _mm256_sub_pd(cr, _mm256_set1_pd(0.25));
+    __m256d q  = _mm256_fmadd_pd(xm, xm, ci2);
+    __m256d cp = _mm256_add_pd(cr, one);
+    __m256d interior = _mm256_or_pd(
+        _mm256_cmp_pd(_mm256_mul_pd(q, _mm256_add_pd(q, xm)), _mm256_mul_pd(_mm256_set1_pd(0.25), ci2), _CMP_LT_OQ),
+        _mm256_cmp_pd(_mm256_fmadd_pd(cp, cp, ci2), _mm256_set1_pd(0.0625), _CMP_LT_OQ));
+    __m256d active = _mm256_andnot_pd(interior, _mm256_castsi256_pd(_mm256_set1_epi64x(-1)));
+
+    for(int iter = 0; iter < max_iter && _mm256_movemask_pd(active); iter++) {
+      __m256d zr2 = _mm256_mul_pd(zr, zr);
+      __m256d zi2 = _mm256_mul_pd(zi, zi);
+
+      zi = _mm256_fmadd_pd(_mm256_add_pd(zr, zr), zi, ci);
+      zr = _mm256_add_pd(_mm256_sub_pd(zr2, zi2), cr);
+
+      __m256d mag = _mm256_fmadd_pd(zr, zr, _mm256_mul_pd(zi, zi));
+      active = _mm256_and_pd(active, _mm256_cmp_pd(mag, four, _CMP_LE_OQ));
+      if(!_mm256_movemask_pd(active))
+        break;
+      n = _mm256_add_pd(n, _mm256_and_pd(active, one));
+    }
+    n = _mm256_blendv_pd(n, maxv, interior);
+
+    _mm_storeu_si128((__m128i *)(row + j), _mm256_cvtpd_epi32(n));
+  }
+
+  for(; j < width; j++)
+    row[j] = mandelbrot(pixel_coord(minReal, j, realStep), imag, max_iter);
+}
+
+/**
+ * @brief kernel AVX-512: 8 pixels consecutivos por registro __m512d,
+ *        com máscaras __mmask8 no lugar de movemask.
+ */
+__attribute__((target("avx512f")))
+static void mandelbrot_row_avx512(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter) {
+  const __m512d four  = _mm512_set1_pd(4.0);
+  const __m512d one   = _mm512_set1_pd(1.0);
+  const __m512d ci    = _mm512_set1_pd(imag);
+  const __m512d ci2   = _mm512_mul_pd(ci, ci);
+  const __m512d maxv  = _mm512_set1_pd((double)max_iter);
+
+  int j = 0;
+  for(; j + 8 <= width; j += 8) {
+    double reals[8];
+    for(int k = 0; k < 8; k++)
+      reals[k] = pixel_coord(minReal, j + k, realStep);
+    __m512d cr  = _mm512_loadu_pd(reals);
+    __m512d zr  = _mm512_setzero_pd();
+    __m512d zi  = _mm512_setzero_pd();
+    __m512d n   = _mm512_setzero_pd();
+
+    // cardioide e bulbo de período 2
+    __m512d xm = _mm512_sub_pd(cr, _mm512_set1_pd(0.25));
+    __m512d q  = _mm512_fmadd_pd(xm, xm, ci2);
+    __m512d cp = _mm512_add_pd(cr, one);
+    __mmask8 interior =
+        _mm512_cmp_pd_mask(_mm512_mul_pd(q, _mm512_add_pd(q, xm)), _mm512_mul_pd(_mm512_set1_pd(0.25), ci2), _CMP_LT_OQ) |
+        _mm512_cmp_pd_mask(_mm512_fmadd_pd(cp, cp, ci2), _mm512_set1_pd(0.0625), _CMP_LT_OQ);
+    __mmask8 active = (__mmask8)~interior;
+
+    for(int iter = 0; iter < max_iter && active; iter++) {
+      __m512d zr2 = _mm512_mul_pd(zr, zr);
+      __m512d zi2 = _mm512_mul_pd(zi, zi);
+
+      zi = _mm512_fmadd_pd(_mm512_add_pd(zr, zr), zi, ci);
+      zr = _mm512_add_pd(_mm512_sub_pd(zr2, zi2), cr);
+
+      __m512d mag = _mm512_fmadd_pd(zr, zr, _mm512_mul_pd(zi, zi));
+      active = _mm512_mask_cmp_pd_mask(active, mag, four, _CMP_LE_OQ);
+      if(!active)
+        break;
+      n = _mm512_mask_add_pd(n, active, n, one);
+    }
+    n = _mm512_mask_mov_pd(n, interior, maxv);
+
+    _mm256_storeu_si256((__m256i *)(row + j), _mm512_cvtpd_epi32(n));
+  }
+
+  for(; j < width; j++)
+    row[j] = mandelbrot(pixel_coord(minReal, j, realStep), imag, max_iter);
+}
+#endif
+
+/**
+ * @brief versão em precisão simples de mandelbrot(), usada em zooms rasos,
+ *        quando a distância entre pixels é muito maior que o epsilon do float.
+ */
+static int mandelbrot_f32(float real, float imag, int max_iter) {
+  float xm = real - 0.25f;
+  float q  = xm*xm + imag*imag;
+  if (q*(q + xm) < 0.25f*imag*imag)                           // cardioide
+      return max_iter;
+  if ((real + 1.0f)*(real + 1.0f) + imag*imag < 0.0625f)      // bulbo de período 2
+      return max_iter;
+
+  float zr = 0;
+  float zi = 0;
+
+  for (int iter = 0; iter < max_iter; iter++)
+  {
+      float new_zr = zr*zr - zi*zi + real;
+      float new_zi = 2*zr*zi + imag;
+
+      zr = new_zr;
+      zi = new_zi;
+
+      if (zr*zr + zi*zi > 4)
+          return iter;
+  }
+
+  return max_iter;
+}
+
+#if HAS_X86_SIMD
+/**
+ * @brief kernel AVX2/FMA em float: 8 pixels consecutivos por registro __m256.
+ *        as coordenadas são calculadas em double e só então convertidas.
+ */
+__attribute__((target("avx2,fma")))
+static void mandelbrot_row_f32_avx2(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter) {
+  const __m256 four = _mm256_set1_ps(4.0f);
+  const __m256 one  = _mm256_set1_ps(1.0f);
+  const __m256 ci   = _mm256_set1_ps((float)imag);
+  const __m256 ci2  = _mm256_mul_ps(ci, ci);
+  const __m256 maxv = _mm256_set1_ps((float)max_iter);
+  const __m256d lanes = _mm256_set_pd(3, 2, 1, 0);
+  const __m256d step  = _mm256_set1_pd(realStep);
+
+  int j = 0;
+  for(; j + 8 <= width; j += 8) {
+    __m256d lo = _mm256_fmadd_pd(_mm256_add_pd(_mm256_set1_pd((double)j), lanes), step, _mm256_set1_pd(minReal));
+    __m256d hi = _mm256_fmadd_pd(_mm256_add_pd(_mm256_set1_pd((double)(j + 4)), lanes), step, _mm256_set1_pd(minReal));
+    __m256 cr = _mm256_set_m128(_mm256_cvtpd_ps(hi), _mm256_cvtpd_ps(lo));
+    __m256 zr = _mm256_setzero_ps();
+    __m256 zi = _mm256_setzero_ps();
+    __m256 n  = _mm256_setzero_ps();
+
+    // cardioide e bulbo de período 2
+    __m256 xm = _mm256_sub_ps(cr, _mm256_set1_ps(0.25f));
+    __m256 q  = _mm256_fmadd_ps(xm, xm, ci2);
+    __m256 cp = _mm256_add_ps(cr, one);
+    __m256 interior = _mm256_or_ps(
+        _mm256_cmp_ps(_mm256_mul_ps(q, _mm256_add_ps(q, xm)), _mm256_mul_ps(_mm256_set1_ps(0.25f), ci2), _CMP_LT_OQ),
+        _mm256_cmp_ps(_mm256_fmadd_ps(cp, cp, ci2), _mm256_set1_ps(0.0625f), _CMP_LT_OQ));
+    __m256 active = _mm256_andnot_ps(interior, _mm256_castsi256_ps(_mm256_set1_epi32(-1)));
+
+    for(int iter = 0; iter < max_iter && _mm256_movemask_ps(active); iter++) {
+      __m256 zr2 = _mm256_mul_ps(zr, zr);
+      __m256 zi2 = _mm256_mul_ps(zi, zi);
+
+      zi = _mm256_fmadd_ps(_mm256_add_ps(zr, zr), zi, ci);
+      zr = _mm256_add_ps(_mm256_sub_ps(zr2, zi2), cr);
+
+      __m256 mag = _mm256_fmadd_ps(zr, zr, _mm256_mul_ps(zi, zi));
+      active = _mm256_and_ps(active, _mm256_cmp_ps(mag, four, _CMP_LE_OQ));
+      if(!_mm256_movemask_ps(active))
+        break;
+      n = _mm256_add_ps(n, _mm256_and_ps(active, one));
+    }
+    n = _mm256_blendv_ps(n, maxv, interior);
+
+    _mm256_storeu_si256((__m256i *)(row + j), _mm256_cvtps_epi32(n));
+  }
+
+  for(; j < width; j++)
+    row[j] = mandelbrot_f32((float)pixel_coord(minReal, j, realStep), (float)imag, max_iter);
+}
+
+/**
+ * @brief kernel AVX-512 em float: 16 pixels consecutivos por registro __m512.
+ */
+__attribute__((target("avx512f")))
+static void mandelbrot_row_f32_avx512(int32_t *row, int width, double minReal, double realStep, double imag, int max_iter) {
+  const __m512 four = _mm512_set1_ps(4.0f);
+  const __m512 one  = _mm512_set1_ps(1.0f);
+  const __m512 ci   = _mm512_set1_ps((float)imag);
+  const __m512 ci2  = _mm512_mul_ps(ci, ci);
+  const __m512 maxv = _mm512_set1_ps((float)max_iter);
+  const __m512d lanes = _mm512_set_pd(7, 6, 5, 4, 3, 2, 1, 0);
+  const __m512d step  = _mm512_set1_pd(realStep);
+
+  int j = 0;
+  for(; j + 16 <= width; j += 16) {
+    __m512d lo = _mm512_fmadd_pd(_mm512_add_pd(_mm512_set1_pd((double)j), lanes), step, _mm512_set1_pd(minReal));
+    __m512d hi = _mm512_fmadd_pd(_mm512_add_pd(_mm512_set1_pd((double)(j + 8)), lanes), step, _mm512_set1_pd(minReal));
+    __m512 cr = _mm512_castpd_ps(_mm512_insertf64x4(
+        _mm512_castps_pd(_mm512_castps256_ps512(_mm512_cvtpd_ps(lo))),
+        _mm256_castps_pd(_mm512_cvtpd_ps(hi)), 1));
+    __m512 zr = _mm512_setzero_ps();
+    __m512 zi = _mm512_setzero_ps();
+    __m512 n  = _mm512_setzero_ps();
+
+    // cardioide e bulbo de período 2
+    __m512 xm = _mm512_sub_ps(cr, _mm512_set1_ps(0.25f));
+    __m512 q  = _mm512_fmadd_ps(xm, xm, ci2);
+    __m512 cp = _mm512_add_ps(cr, one);
+    __mmask16 interior =
+        _mm512_cmp_ps_mask(_mm512_mul_ps(q, _mm512_add_ps(q, xm)), _mm512_mul_ps(_mm512_set1_ps(0.25f), ci2), _CMP_LT_OQ) |
+        _mm512_cmp_ps_mask(_mm512_fmadd_ps(cp, cp, ci2), _mm512_set1_ps(0.0625f), _CMP_LT_OQ);
+    __mmask16 active = (__mmask16)~interior;
+
+    for(int iter = 0; iter < max_iter && active; iter++) {
+      __m512 zr2 = _mm512_mul_ps(zr, zr);
+      __m512 zi2 = _mm512_mul_ps(zi, zi);
+
+      zi = _mm512_fmadd_ps(_mm512_add_ps(zr, zr), zi, ci);
+      zr = _mm512_add_ps(_mm512_sub_ps(zr2, zi2), cr);
+
+      __m512 mag = _mm512_fmadd_ps(zr, zr, _mm512_mul_ps(zi, zi));
+      active = _mm512_mask_cmp_ps_mask(active, mag, four, _CMP_LE_OQ);
+      if(!active)
+        break;
+      n = _mm512_mask_add_ps(n, active, n, one);
+    }
+    n = _mm512_mask_mov_ps(n, interior, maxv);
+
+    _mm512_storeu_si512((void *)(row + j), _mm512_cvtps_epi32(n));
+  }
+
+  for(; j < width; j++)
+    row[j] = mandelbrot_f32((float)pixel_coord(minReal, j, realStep), (float)imag, max_iter);
+}
+#endif
+
+/**
+ * @brief escolhe o kernel de linha mais rápido suportado pela CPU.
+ * @param f32  true para os kernels em precisão simples.
+ */
+static row_kernel_fn select_row_kernel(bool f32) {
+#if HAS_X86_SIMD
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("avx512f"))
+    return f32 ? mandelbrot_row_f32_avx512 : mandelbrot_row_avx512;
+  if (__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma"))
+    return f32 ? mandelbrot_row_f32_avx2 : mandelbrot_row_avx2;
+#endif
+  return f32 ? mandelbrot_row_lanes<float> : mandelbrot_row_lanes<double>;
+}
+
+// resolvidos uma vez, quando a biblioteca é carregada
+static const row_kernel_fn row_kernel     = select_row_kernel(false);
+static const row_kernel_fn row_kernel_f32 = select_row_kernel(true);
+
+/**
+ * @brief adapta um kernel de linha à grade de pixels: a linha i da imagem
+ *        tem parte imaginária minImag + i * imagStep (ver pixel_coord).
+ */
+struct GridRow {
+  row_kernel_fn kernel;
+  int width;
+  double minReal, realStep, minImag, imagStep;
+  int max_iter;
+
+  GridRow(row_kernel_fn kernel, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter)
+    : kernel(kernel), width(width),
+      minReal(minReal), realStep((maxReal - minReal) / (double)width),
+      minImag(minImag), imagStep((maxImag - minImag) / (double)height),
+      max_iter(max_iter) {}
+
+  void operator()(int32_t *row, int i) const {
+    kernel(row, width, minReal, realStep, pixel_coord(minImag, i, imagStep), max_iter);
+  }
+};
+
+/**
+ * @brief kernel de linha por perturbação, para zooms profundos.
+ *
+ * uma órbita de referência Z_n é calculada uma vez, em long double, no
+ * pixel central c_ref, tomado na grade dos demais kernels. cada pixel itera só o desvio dz_n = z_n - Z_n:
+ *   dz_{n+1} = (2 Z_n + dz_n) dz_n + dc,   dc = c - c_ref
+ * com dc obtido direto do deslocamento em pixels, sem o cancelamento de
+ * subtrair coordenadas absolutas quase iguais. quando |Z_n + dz_n| < |dz_n|
+ * (glitch) ou a referência termina, o pixel é rebaseado: dz passa a ser
+ * o z completo e a órbita recomeça de Z_0 = 0.
+ */
+struct PerturbedRow {
+  std::vector<double> Zr, Zi;   // órbita de referência Z_0 .. Z_ref_len
+  int ref_len;
+  int width, jref, iref;
+  double realStep, imagStep;
+  double crefr, crefi;
+  int max_iter;
+
+  PerturbedRow(int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter)
+    : width(width), jref(width / 2), iref(height / 2),
+      realStep((maxReal - minReal) / (double)width),
+      imagStep((maxImag - minImag) / (double)height),
+      max_iter(max_iter) {
+    // c_ref fica na mesma grade de GridRow (pixel_coord): calculado em long
+    // double, na linha do eixo real sobraria uma parte imaginária residual
+    crefr = pixel_coord(minReal, jref, realStep);
+    crefi = pixel_coord(minImag, iref, imagStep);
+    const long double cr = crefr, ci = crefi;
+
+    Zr.reserve(max_iter + 1);
+    Zi.reserve(max_iter + 1);
+    Zr.push_back(0.0);
+    Zi.push_back(0.0);
+
+    long double zr = 0, zi = 0;
+    for(int n = 0; n < max_iter; n++) {
+      long double new_zr = zr*zr - zi*zi + cr;
+      long double new_zi = 2*zr*zi + ci;
+      zr = new_zr;
+      zi = new_zi;
+      Zr.push_back((double)zr);
+      Zi.push_back((double)zi);
+      if (zr*zr + zi*zi > 4)
+        break;
+    }
+    ref_len = (int)Zr.size() - 1;
+  }
+
+  int pixel(int j, int i) const {
+    double dcr = (j - jref) * realStep;
+    double dci = (i - iref) * imagStep;
+
+    // cardioide e bulbo de período 2
+    double real = crefr + dcr, imag = crefi + dci;
+    double xm = real - 0.25;
+    double q  = xm*xm + imag*imag;
+    if (q*(q + xm) < 0.25*imag*imag || (real + 1.0)*(real + 1.0) + imag*imag < 0.0625)
+      return max_iter;
+
+    double dzr = 0, dzi = 0;
+    int m = 0;
+    for(int iter = 0; iter < max_iter; iter++) {
+      double tr = 2*Zr[m] + dzr;
+      double ti = 2*Zi[m] + dzi;
+      double new_dzr = tr*dzr - ti*dzi + dcr;
+      double new_dzi = tr*dzi + ti*dzr + dci;
+      dzr = new_dzr;
+      dzi = new_dzi;
+      m++;
+
+      double zr  = Zr[m] + dzr;
+      double zi  = Zi[m] + dzi;
+      double mag = zr*zr + zi*zi;
+      if (mag > 4)
+        return iter;
+
+      // rebase: glitch ou fim da órbita de referência
+      if (mag < dzr*dzr + dzi*dzi || m == ref_len) {
+        dzr = zr;
+        dzi = zi;
+        m   = 0;
+      }
+    }
+    return max_iter;
+  }
+
+  void operator()(int32_t *row, int i) const {
+    for(int j = 0; j < width; j++)
+      row[j] = pixel(j, i);
+  }
+};
+
+/**
+ * @brief preenche o buffer de iterações linha a linha com o kernel dado.
+ */
+template <typename RowFn>
+static void compute_iters(const RowFn &row_fn, int32_t *out, int width, int height) {
+ // escalonamento dinâmico: linhas próximas do conjunto custam max_iter
+ // iterações por pixel, enquanto as do exterior escapam em poucas
+ #pragma omp parallel for schedule(dynamic, 8)
+ for(int i = 0; i < height; i++) {
+   // armazena resultado da linha no buffer (cada linha é exclusiva da thread)
+   row_fn(out + (size_t)i * width, i);
+ }
+
+}
+
+/**
+ * @brief calcula cada linha com o kernel dado num buffer próprio da thread
+ *        e a traduz para RGB pela tabela de cores.
+ */
+template <typename RowFn>
+static void compute_rgb(const RowFn &row_fn, uint8_t *out, const uint8_t *lut, int width, int height, int max_iter) {
+ #pragma omp parallel
+ {
+   std::vector<int32_t> iters(width);
+
+   #pragma omp for schedule(dynamic, 8)
+   for(int i = 0; i < height; i++) {
+     row_fn(iters.data(), i);
+
+     uint8_t *px = out + (size_t)i * width * 3;
+     for(int j = 0; j < width; j++) {
+       const uint8_t *cor = lut + (size_t)std::min(iters[j], (int32_t)max_iter) * 3;
+       px[3*j]     = cor[0];
+       px[3*j + 1] = cor[1];
+       px[3*j + 2] = cor[2];
+     }
+   }
+ }
+
+}
+
 /**
  * @brief Calcula o conjunto de Mandelbrot para uma grade de pixels.
  * A função tem a linkagem C pra ser carregada pelo Python a partir do ctypes.CDLL
- * @param out       buffer de saída (width * height inteiros).
+ * @param out       buffer de saída (width * height inteiros de 32 bits,
+ *                  o mesmo layout de um array numpy int32 H x W).
  * @param width     kargura da imagem em pixels.
  * @param height    altura da imagem em pixels.
  * @param minReal   limite inferior do eixo real.
@@ -73,20 +616,59 @@ static int mandelbrot(double real, double imag, int max_iter) {
  * @param maxImag   limite superior do eixo imaginário.
  * @param max_iter  número máximo de iterações por ponto.
  */
-extern "C" void calculate_mandelbrot(int *out, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
- double realStep = (maxReal - minReal) / (double)width;
- double imagStep = (maxImag - minImag) / (double)height;
+extern "C" void calculate_mandelbrot(int32_t *out, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_iters(GridRow(row_kernel, width, height, minReal, maxReal, minImag, maxImag, max_iter), out, width, height);
+}
 
- for(int i = 0; i < height; i++) {
-   double imag = minImag + i * imagStep;
+/**
+ * @brief mesma interface de calculate_mandelbrot, iterando em float
+ *        (8 pixels por registro AVX2, 16 com AVX-512). Só é adequada
+ *        enquanto a distância entre pixels for bem maior que o epsilon
+ *        do float; o Python a escolhe para zooms rasos.
+ */
+extern "C" void calculate_mandelbrot_f32(int32_t *out, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_iters(GridRow(row_kernel_f32, width, height, minReal, maxReal, minImag, maxImag, max_iter), out, width, height);
+}
 
-   for(int j = 0; j < width; j++) {
-     double real = minReal + j * realStep;
-      // armazena resultado no buffer
-     out[i * width + j] = mandelbrot(real, imag, max_iter);
-   }
- }
+/**
+ * @brief mesma interface de calculate_mandelbrot, por perturbação em torno
+ *        de uma órbita de referência (ver PerturbedRow). O Python a escolhe
+ *        para zooms profundos.
+ */
+extern "C" void calculate_mandelbrot_perturbed(int32_t *out, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_iters(PerturbedRow(width, height, minReal, maxReal, minImag, maxImag, max_iter), out, width, height);
+}
+
+/**
+ * @brief Calcula o conjunto de Mandelbrot e já converte cada pixel em RGB.
+ * Evita devolver a matriz de iterações ao Python só para colori-la lá:
+ * cada thread calcula uma linha num buffer próprio e a traduz pela tabela.
+ * @param out       buffer de saída (width * height * 3 bytes, RGB intercalado).
+ * @param lut       tabela de cores ((max_iter + 1) * 3 bytes), indexada pela iteração.
+ * @param width     largura da imagem em pixels.
+ * @param height    altura da imagem em pixels.
+ * @param minReal   limite inferior do eixo real.
+ * @param maxReal   limite superior do eixo real.
+ * @param minImag   limite inferior do eixo imaginário.
+ * @param maxImag   limite superior do eixo imaginário.
+ * @param max_iter  número máximo de iterações por ponto.
+ */
+extern "C" void calculate_mandelbrot_rgb(uint8_t *out, const uint8_t *lut, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_rgb(GridRow(row_kernel, width, height, minReal, maxReal, minImag, maxImag, max_iter), out, lut, width, height, max_iter);
+}
 
+/**
+ * @brief mesma interface de calculate_mandelbrot_rgb, iterando em float.
+ */
+extern "C" void calculate_mandelbrot_rgb_f32(uint8_t *out, const uint8_t *lut, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_rgb(GridRow(row_kernel_f32, width, height, minReal, maxReal, minImag, maxImag, max_iter), out, lut, width, height, max_iter);
+}
+
+/**
+ * @brief mesma interface de calculate_mandelbrot_rgb, por perturbação.
+ */
+extern "C" void calculate_mandelbrot_perturbed_rgb(uint8_t *out, const uint8_t *lut, int width, int height, double minReal, double maxReal, double minImag, double maxImag, int max_iter) {
+ compute_rgb(PerturbedRow(width, height, minReal, maxReal, minImag, maxImag, max_iter), out, lut, width, height, max_iter);
 }
 
 /*
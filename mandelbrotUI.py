@@ -11,7 +11,11 @@ Dependências:
     - Python 3 (com tkinter)
     - numpy
     - Pillow (PIL)
-    - biblioteca compilada: main.so (Linux) ou main.dll (Windows)
+    - numba (opcional — calcula e colore o fractal quando a biblioteca C++
+      não foi compilada; com uma GPU CUDA disponível, os zooms com muitas
+      iterações são calculados na placa de vídeo)
+    - biblioteca compilada: main.so (Linux) ou main.dll (Windows),
+      obrigatória apenas quando o numba não está instalado
 
 Uso:
     python3 mandelbrotUI.py
@@ -24,11 +28,26 @@ import os
 import sys
 import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
 
 import numpy as np
 from PIL import Image, ImageTk
 
+try:
+    from numba import njit, prange, cuda
+except ImportError:  # numba é opcional: sem ele, a coloração usa só numpy
+    njit = None
+
+def cudaDisponivel() -> bool:
+    """indica se o numba encontrou uma GPU CUDA utilizável."""
+    if njit is None:
+        return False
+    try:
+        return cuda.is_available()
+    except Exception:
+        return False
+
 # Carregamento da biblioteca C++ via ctypes
 
 
@@ -39,73 +58,253 @@ else:
 
 LIB_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), LIB_NAME)
 
+# distância mínima entre pixels para usar os kernels C++ em float, o padrão
+# da biblioteca nos zooms rasos: abaixo disso a precisão simples já distorce
+# a imagem e o cálculo passa para double
+PASSO_MIN_F32 = 1e-5
+
+# largura máxima do eixo real para usar o kernel C++ por perturbação:
+# abaixo disso (zooms profundos) ele é preferido a qualquer outro motor
+LARGURA_MAX_PERTURBACAO = 1e-4
+
+# número mínimo de iterações para calcular na GPU (CUDA) mesmo com a
+# biblioteca C++ carregada (o caso da espiral em mandelbrot_case.py usa 1024):
+# abaixo disso a biblioteca calcula e colore em uma única chamada, sem a
+# cópia do resultado da GPU
+ITER_MIN_CUDA = 1024
+
 def loadLib():
     """
     carrega a biblioteca compartilhada C++ e configura os tipos dos
-    argumentos e do retorno da função calculate_mandelbrot.
+    argumentos e do retorno das funções calculate_mandelbrot e
+    calculate_mandelbrot_rgb (e de suas variantes _f32 e _perturbed).
     retorna o objeto ctypes.CDLL pronto para uso.
-    encerra o programa com mensagem de erro caso a biblioteca não exista.
+    com o numba instalado a biblioteca é opcional e retorna None caso não
+    exista; sem ele, encerra o programa com mensagem de erro.
     """
     if not os.path.exists(LIB_PATH):
+        if njit is not None:
+            return None
         messagebox.showerror(
             "Erro",
             f"Biblioteca não encontrada: {LIB_PATH}\n\n"
             "Compile com:\n"
             "  make\n"
-            "  ou g++ -O2 -shared -fPIC -o main.so main.cpp (Linux)"
+            "  ou (Linux):\n"
+            "  g++ -O3 -march=native -ffast-math -funroll-loops -fopenmp -fPIC -c -o main.o main.cpp\n"
+            "  g++ -fopenmp -shared -o main.so main.o"
         )
         sys.exit(1)
     lib = ctypes.CDLL(LIB_PATH)
 
-    # Protótipo: void calculate_mandelbrot(int*, int, int, double, double, double, double, int)
-    lib.calculate_mandelbrot.restype  = None
-    lib.calculate_mandelbrot.argtypes = [
-        ctypes.POINTER(ctypes.c_int),  # out — buffer de saída
-        ctypes.c_int,                  # width
-        ctypes.c_int,                  # height
-        ctypes.c_double,               # minReal
-        ctypes.c_double,               # maxReal
-        ctypes.c_double,               # minImag
-        ctypes.c_double,               # maxImag
-        ctypes.c_int,                  # max_iter
-    ]
+    # Protótipo: void calculate_mandelbrot(int32_t*, int, int, double, double, double, double, int)
+    # o buffer de saída é um array numpy int32 (H x W) passado diretamente,
+    # sem conversão para array ctypes a cada chamada.
+    # as variantes _f32 (precisão simples) e _perturbed (zoom profundo)
+    # têm a mesma assinatura.
+    for nome in ("calculate_mandelbrot", "calculate_mandelbrot_f32",
+                 "calculate_mandelbrot_perturbed"):
+        func = getattr(lib, nome)
+        func.restype  = None
+        func.argtypes = [
+            np.ctypeslib.ndpointer(np.int32, ndim=2, flags="C_CONTIGUOUS"),  # out — buffer de saída
+            ctypes.c_int,                  # width
+            ctypes.c_int,                  # height
+            ctypes.c_double,               # minReal
+            ctypes.c_double,               # maxReal
+            ctypes.c_double,               # minImag
+            ctypes.c_double,               # maxImag
+            ctypes.c_int,                  # max_iter
+        ]
+
+    # Protótipo: void calculate_mandelbrot_rgb(uint8_t*, const uint8_t*, int, int, double, double, double, double, int)
+    # calcula e colore em uma só chamada, escrevendo direto no buffer RGB (H x W x 3).
+    for nome in ("calculate_mandelbrot_rgb", "calculate_mandelbrot_rgb_f32",
+                 "calculate_mandelbrot_perturbed_rgb"):
+        func = getattr(lib, nome)
+        func.restype  = None
+        func.argtypes = [
+            np.ctypeslib.ndpointer(np.uint8, ndim=3, flags="C_CONTIGUOUS"),  # out — imagem RGB
+            np.ctypeslib.ndpointer(np.uint8, ndim=2, flags="C_CONTIGUOUS"),  # lut — tabela de cores
+            ctypes.c_int,                  # width
+            ctypes.c_int,                  # height
+            ctypes.c_double,               # minReal
+            ctypes.c_double,               # maxReal
+            ctypes.c_double,               # minImag
+            ctypes.c_double,               # maxImag
+            ctypes.c_int,                  # max_iter
+        ]
     return lib
 
-def colorir(iters: np.ndarray, max_iter: int) -> np.ndarray:
+def construir_lut(max_iter: int) -> np.ndarray:
     """
-    converte a matriz de contagens de iteração em uma imagem RGB (H x W x 3).
-    utiliza escala logarítmica para suavizar o gradiente de cores.
-    pontos que pertencem ao conjunto (iter >= max_iter) são pintados de preto.
+    monta a tabela de cores (max_iter+1 x 3, uint8) indexada pela contagem
+    de iterações. utiliza escala logarítmica para suavizar o gradiente de cores.
+    pontos que pertencem ao conjunto (iter == max_iter) são pintados de preto.
     """
-    t = np.log1p(iters.astype(float)) / np.log1p(max_iter)
-    t = np.clip(t, 0.0, 1.0)
+    t = np.log1p(np.arange(max_iter + 1, dtype=np.float32)) / np.float32(np.log1p(max_iter))
 
-    r = (t * 100).astype(np.uint8)
-    g = (t * 180).astype(np.uint8)
-    b = (t * 255).astype(np.uint8)
+    lut = np.empty((max_iter + 1, 3), dtype=np.uint8)
+    lut[:, 0] = t * 100
+    lut[:, 1] = t * 180
+    lut[:, 2] = t * 255
 
     # Pontos do conjunto: preto
-    inside = iters >= max_iter
-    r[inside] = g[inside] = b[inside] = 0
+    lut[max_iter] = 0
+
+    return lut
+
+# os kernels rodam na thread de cálculo da interface: nogil=True libera o GIL
+# durante a chamada (como o ctypes faz com a biblioteca C++), senão a thread
+# de Tk ficaria parada até o fim de cada imagem
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True, nogil=True)
+    def iters_to_rgb(iters, max_iter, lut, out):
+        """
+        colore a matriz de iterações com a tabela lut: escreve o RGB de cada
+        pixel direto no buffer out (H x W x 3), em paralelo por linha e sem
+        alocar memória.
+        """
+        for y in prange(iters.shape[0]):
+            for x in range(iters.shape[1]):
+                v = iters[y, x]
+                if v >= max_iter:
+                    out[y, x, 0] = 0
+                    out[y, x, 1] = 0
+                    out[y, x, 2] = 0
+                else:
+                    out[y, x, 0] = lut[v, 0]
+                    out[y, x, 1] = lut[v, 1]
+                    out[y, x, 2] = lut[v, 2]
+
+    # sem fastmath: a contração em FMA mudaria a linha do eixo real e os
+    # pontos da antena, e a imagem deixaria de ser igual à do C++
+    @njit(parallel=True, cache=True, boundscheck=False, nogil=True)
+    def mandel(out, minReal, maxReal, minImag, maxImag, max_iter):
+        """
+        mesmo algoritmo de calculate_mandelbrot (main.cpp), compilado pelo
+        numba e executado em paralelo por linha direto no buffer out (H x W).
+        """
+        height, width = out.shape
+        realStep = (maxReal - minReal) / width
+        imagStep = (maxImag - minImag) / height
+
+        for i in prange(height):
+            imag = minImag + i * imagStep
+            for j in range(width):
+                real = minReal + j * realStep
+
+                # cardioide e bulbo de período 2 nunca divergem (mesmo teste do C++)
+                xm = real - 0.25
+                q  = xm*xm + imag*imag
+                if q*(q + xm) < 0.25*imag*imag or (real + 1.0)**2 + imag*imag < 0.0625:
+                    out[i, j] = max_iter
+                    continue
+
+                zr = 0.0
+                zi = 0.0
+                n  = max_iter
+                for it in range(max_iter):
+                    zr, zi = zr*zr - zi*zi + real, 2*zr*zi + imag
+                    if zr*zr + zi*zi > 4.0:
+                        n = it
+                        break
+                out[i, j] = n
+else:
+    iters_to_rgb = None
+    mandel       = None
 
-    return np.stack([r, g, b], axis=-1)
+if cudaDisponivel():
+    @cuda.jit
+    def mandel_cu(out, minReal, realStep, minImag, imagStep, max_iter):
+        """
+        versão CUDA de mandel: uma thread por pixel, em blocos de 16 x 16.
+        """
+        j, i = cuda.grid(2)
+        if j >= out.shape[1] or i >= out.shape[0]:
+            return
+
+        real = minReal + j * realStep
+        imag = minImag + i * imagStep
+
+        # cardioide e bulbo de período 2 nunca divergem (mesmo teste do C++)
+        xm = real - 0.25
+        q  = xm*xm + imag*imag
+        if q*(q + xm) < 0.25*imag*imag or (real + 1.0)**2 + imag*imag < 0.0625:
+            out[i, j] = max_iter
+            return
+
+        zr = 0.0
+        zi = 0.0
+        n  = max_iter
+        for it in range(max_iter):
+            zr, zi = zr*zr - zi*zi + real, 2*zr*zi + imag
+            if zr*zr + zi*zi > 4.0:
+                n = it
+                break
+        out[i, j] = n
+else:
+    mandel_cu = None
+
+class Buffers:
+    """
+    buffers de saída de uma resolução: matriz de iterações, imagem RGB e,
+    com gpu=True, a matriz equivalente na GPU. alocados uma vez e reaproveitados.
+    """
+    def __init__(self, W: int, H: int, gpu: bool = False):
+        self.W, self.H = W, H
+        self.iters = np.empty((H, W), dtype=np.int32)
+        self.rgb   = np.empty((H, W, 3), dtype=np.uint8)
+        self.d_iters = None
+        if gpu:
+            self.d_iters = cuda.device_array((H, W), dtype=np.int32)
 
 class App:
     """
     classe principal da interface gráfica.
     cria uma janela Tkinter com controles para configurar o número de
     iterações, renderizar o fractal e resetar a visualização.
-    a renderização invoca a função C++ calculate_mandelbrot e exibe
-    o resultado como imagem no canvas.
+    a renderização usa a biblioteca C++, a GPU (CUDA) ou o kernel numba
+    (ver _calcular) e exibe o resultado como imagem no canvas.
+    o cálculo roda numa thread separada: primeiro uma prévia em baixa
+    resolução, depois a imagem completa.
     """
     W, H = 700, 500
     Bounds_Default = [-2.5, 1.0, -1.2, 1.2]  # minReal, maxReal, minImag, maxImag
+    Fator_Previa   = 4    # a prévia é calculada em (W / 4) x (H / 4)
+    Atraso_ms      = 30   # pedidos mais próximos que isso são agrupados
+    Intervalo_ms   = 15   # intervalo de verificação da thread de cálculo
 
     def __init__(self, root: tk.Tk, lib):
         self.root   = root
         self.lib    = lib
         self.bounds = self.Bounds_Default.copy()
 
+        # buffers da imagem completa e da prévia, reaproveitados enquanto
+        # o tamanho da imagem não mudar (ver _garantir_buffers)
+        self._completa = None
+        self._previa   = None
+        self._garantir_buffers()
+
+        # tabela de cores, reconstruída apenas quando max_iter muda
+        self._lut           = None
+        self._prev_max_iter = None
+
+        # thread única de cálculo: as tarefas nunca rodam em paralelo entre si,
+        # então os buffers só são lidos pela interface depois de concluídas
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._gen      = 0      # incrementado a cada pedido de renderização
+        self._tarefa   = None   # (gen, prévia, completa, bounds, max_iter) em andamento
+        self._agendado = None   # id do after() que vai disparar o próximo cálculo
+        self._previa_exibida = False
+
+        if lib is None:
+            # força a compilação (ou leitura do cache) antes da primeira renderização
+            mandel(np.zeros((1, 1), np.int32), 0.0, 1.0, 0.0, 1.0, 1)
+        if lib is None or mandel_cu is not None:
+            iters_to_rgb(np.zeros((1, 1), np.int32), 1, construir_lut(1),
+                         np.empty((1, 1, 3), np.uint8))
+
         root.title("Mandelbrot")
         root.resizable(False, False)
 
@@ -125,6 +324,10 @@ class App:
         self.canvas = tk.Canvas(root, width=self.W, height=self.H, cursor="crosshair")
         self.canvas.pack(padx=8, pady=(0, 4))
 
+        # imagem Tk única, atualizada com paste() a cada renderização
+        self._photo      = ImageTk.PhotoImage("RGB", (self.W, self.H))
+        self._canvas_img = self.canvas.create_image(0, 0, anchor=tk.NW, image=self._photo)
+
         # variáveis para seleção de zoom com o mouse
         self._sel_start = None   
         self._sel_rect  = None   
@@ -142,25 +345,122 @@ class App:
         self.renderizar()
 
     def renderizar(self):
-        """chamar a biblioteca C++ para calcular o conjunto e exibe a imagem no canvas."""
-        W, H     = self.W, self.H
+        """
+        pede uma nova renderização. pedidos feitos em sequência rápida são
+        agrupados em um só, e um cálculo completo ainda não iniciado é
+        cancelado, pois o resultado já estaria desatualizado.
+        """
+        self._gen += 1
+        if self._tarefa is not None:
+            self._tarefa[2].cancel()
+        if self._agendado is not None:
+            self.root.after_cancel(self._agendado)
+        self._agendado = self.root.after(self.Atraso_ms, self._disparar)
+
+    def _disparar(self):
+        """envia a prévia e a imagem completa para a thread de cálculo."""
+        self._agendado = None
+        if self._tarefa is not None:
+            return  # _verificar dispara de novo quando a tarefa atual terminar
+
         max_iter = self.iter_var.get()
-        mR, MR, mI, MI = self.bounds
+        bounds   = tuple(self.bounds)
+
+        # nenhuma tarefa em andamento: é seguro trocar buffers e tabela
+        self._garantir_buffers()
+        if max_iter != self._prev_max_iter:
+            self._rebuild_lut(max_iter)
 
         self.status.set("Calculando…")
-        self.root.update_idletasks()
+        previa   = self._executor.submit(self._calcular, self._previa,
+                                         self._lut, *bounds, max_iter)
+        completa = self._executor.submit(self._calcular, self._completa,
+                                         self._lut, *bounds, max_iter)
+        self._tarefa = (self._gen, previa, completa, bounds, max_iter)
+        self._previa_exibida = False
+        self.root.after(self.Intervalo_ms, self._verificar)
+
+    def _garantir_buffers(self):
+        """realoca os buffers apenas se o tamanho da imagem (W, H) mudou."""
+        if self._completa is None or (self._completa.W, self._completa.H) != (self.W, self.H):
+            gpu = mandel_cu is not None
+            self._completa = Buffers(self.W, self.H, gpu)
+            self._previa   = Buffers(self.W // self.Fator_Previa, self.H // self.Fator_Previa, gpu)
+
+    def _rebuild_lut(self, max_iter):
+        """reconstrói a tabela de cores para um novo número de iterações."""
+        self._lut           = construir_lut(max_iter)
+        self._prev_max_iter = max_iter
+
+    def _verificar(self):
+        """
+        acompanha a tarefa em andamento: exibe a prévia assim que fica pronta
+        e, ao fim, a imagem completa. resultados de pedidos já substituídos
+        são descartados e o pedido mais recente é disparado. um erro no
+        cálculo é mostrado na barra de status e não trava novos pedidos.
+        """
+        gen, previa, completa, bounds, max_iter = self._tarefa
+        atual = gen == self._gen
 
-        buf = (ctypes.c_int * (W * H))()
-        self.lib.calculate_mandelbrot(buf, W, H, mR, MR, mI, MI, max_iter)
+        if atual and not self._previa_exibida and previa.done():
+            self._previa_exibida = True
+            if not previa.cancelled() and previa.exception() is None:
+                self._exibir(self._previa)
 
-        iters    = np.frombuffer(buf, dtype=np.int32).reshape(H, W)
-        rgb      = colorir(iters, max_iter)
-        img      = Image.fromarray(rgb, mode="RGB")
-        self._photo = ImageTk.PhotoImage(img)
+        if not completa.done():
+            self.root.after(self.Intervalo_ms, self._verificar)
+            return
 
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self._photo)
-        self.status.set(f"Re [{mR:.3f}, {MR:.3f}]  Im [{mI:.3f}, {MI:.3f}]  iter={max_iter}")
+        # liberada antes de ler o resultado: assim um erro não impede o
+        # próximo cálculo
+        self._tarefa = None
+        if not atual or completa.cancelled():
+            if self._agendado is None:
+                self._disparar()
+        elif completa.exception() is not None:
+            self.status.set(f"Erro no cálculo: {completa.exception()}")
+        else:
+            self._exibir(self._completa)
+            mR, MR, mI, MI = bounds
+            self.status.set(f"Re [{mR:.3f}, {MR:.3f}]  Im [{mI:.3f}, {MI:.3f}]  iter={max_iter}")
+
+    def _exibir(self, buf):
+        """copia a imagem de buf para o canvas, ampliando a prévia se preciso."""
+        # frombuffer lê o array sem copiar; paste reaproveita a imagem Tk
+        img = Image.frombuffer("RGB", (buf.W, buf.H), buf.rgb, "raw", "RGB", 0, 1)
+        if (buf.W, buf.H) != (self.W, self.H):
+            img = img.resize((self.W, self.H), Image.NEAREST)
+        self._photo.paste(img)
+
+    def _calcular(self, buf, lut, mR, MR, mI, MI, max_iter):
+        """
+        preenche buf.rgb com a imagem colorida. nos zooms profundos a
+        biblioteca C++, se carregada, calcula por perturbação. com uma GPU
+        CUDA detectada ao carregar o módulo, ela é usada a partir de
+        ITER_MIN_CUDA iterações (ou sempre, sem a biblioteca). nos demais
+        casos a biblioteca calcula e colore em uma única chamada (em float
+        nos zooms rasos), e o numba na CPU fica para quando ela não existe.
+        roda na thread de cálculo.
+        """
+        W, H = buf.W, buf.H
+        if self.lib is not None and MR - mR < LARGURA_MAX_PERTURBACAO:
+            self.lib.calculate_mandelbrot_perturbed_rgb(buf.rgb, lut, W, H,
+                                                        mR, MR, mI, MI, max_iter)
+        elif mandel_cu is not None and (max_iter >= ITER_MIN_CUDA or self.lib is None):
+            blocos = ((W + 15) // 16, (H + 15) // 16)
+            mandel_cu[blocos, (16, 16)](buf.d_iters, mR, (MR - mR) / W,
+                                        mI, (MI - mI) / H, max_iter)
+            buf.d_iters.copy_to_host(buf.iters)
+            iters_to_rgb(buf.iters, max_iter, lut, buf.rgb)
+        elif self.lib is not None:
+            if (MR - mR) / W > PASSO_MIN_F32 and (MI - mI) / H > PASSO_MIN_F32:
+                func = self.lib.calculate_mandelbrot_rgb_f32
+            else:
+                func = self.lib.calculate_mandelbrot_rgb
+            func(buf.rgb, lut, W, H, mR, MR, mI, MI, max_iter)
+        else:
+            mandel(buf.iters, mR, MR, mI, MI, max_iter)
+            iters_to_rgb(buf.iters, max_iter, lut, buf.rgb)
 
     def resetar(self):
         """restaura os limites padrão e rerenderiza."""
@@ -13,8 +13,10 @@ uso:
 """
 
 import ctypes
+import functools
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from PIL import Image
@@ -36,51 +38,84 @@ if not os.path.exists(LIB_PATH):
     sys.exit(1)
 
 lib = ctypes.CDLL(LIB_PATH)
-lib.calculate_mandelbrot.restype = None
-lib.calculate_mandelbrot.argtypes = [
-    ctypes.POINTER(ctypes.c_int),   # out  — buffer de saída
-    ctypes.c_int,                   # width
-    ctypes.c_int,                   # height
-    ctypes.c_double,                # minReal
-    ctypes.c_double,                # maxReal
-    ctypes.c_double,                # minImag
-    ctypes.c_double,                # maxImag
-    ctypes.c_int,                   # max_iter
-]
+# calculate_mandelbrot_perturbed tem a mesma assinatura (zooms profundos)
+for _func in (lib.calculate_mandelbrot, lib.calculate_mandelbrot_perturbed):
+    _func.restype = None
+    _func.argtypes = [
+        np.ctypeslib.ndpointer(np.int32, ndim=2, flags="C_CONTIGUOUS"),  # out  — buffer de saída
+        ctypes.c_int,                   # width
+        ctypes.c_int,                   # height
+        ctypes.c_double,                # minReal
+        ctypes.c_double,                # maxReal
+        ctypes.c_double,                # minImag
+        ctypes.c_double,                # maxImag
+        ctypes.c_int,                   # max_iter
+    ]
+
+# largura do eixo real abaixo da qual o cálculo é feito por perturbação
+LARGURA_MAX_PERTURBACAO = 1e-4
 
 
 # Funções auxiliares
 
-def calcular(width: int, height: int, bounds: list, max_iter: int) -> np.ndarray:
-    """chama a função C++ e retorna a matriz de iterações."""
-    buf = (ctypes.c_int * (width * height))()
-    lib.calculate_mandelbrot(
-        buf, width, height,
+def calcular(width: int, height: int, bounds: list, max_iter: int,
+             out: np.ndarray = None) -> np.ndarray:
+    """
+    chama a função C++ e retorna a matriz de iterações.
+    out é um buffer int32 (height x width) opcional, reaproveitado entre
+    chamadas de mesmo tamanho; um novo só é alocado se out faltar ou tiver
+    outro formato. regiões mais estreitas que LARGURA_MAX_PERTURBACAO são
+    calculadas por perturbação.
+    """
+    if out is None or out.shape != (height, width) or out.dtype != np.int32:
+        out = np.empty((height, width), dtype=np.int32)
+    if bounds[1] - bounds[0] < LARGURA_MAX_PERTURBACAO:
+        func = lib.calculate_mandelbrot_perturbed
+    else:
+        func = lib.calculate_mandelbrot
+    func(
+        out, width, height,
         bounds[0], bounds[1], bounds[2], bounds[3],
         max_iter,
     )
-    return np.frombuffer(buf, dtype=np.int32).reshape(height, width)
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def construir_lut(max_iter: int) -> np.ndarray:
+    """
+    monta a tabela de cores (max_iter+1 x 3) indexada pela contagem de iterações.
+    a tabela é guardada em cache por max_iter e não deve ser modificada.
+    """
+    t = np.log1p(np.arange(max_iter + 1, dtype=np.float32)) / np.float32(np.log1p(max_iter))
 
+    lut = np.empty((max_iter + 1, 3), dtype=np.uint8)
+    lut[:, 0] = t * 100
+    lut[:, 1] = t * 180
+    lut[:, 2] = t * 255
 
-def colorir(iters: np.ndarray, max_iter: int) -> np.ndarray:
-    """converte a matriz de iterações em uma imagem RGB."""
-    t = np.log1p(iters.astype(float)) / np.log1p(max_iter)
-    t = np.clip(t, 0.0, 1.0)
+    lut[max_iter] = 0
 
-    r = (t * 100).astype(np.uint8)
-    g = (t * 180).astype(np.uint8)
-    b = (t * 255).astype(np.uint8)
+    return lut
 
-    inside = iters >= max_iter
-    r[inside] = g[inside] = b[inside] = 0
 
-    return np.stack([r, g, b], axis=-1)
+def colorir(iters: np.ndarray, max_iter: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    converte a matriz de iterações em uma imagem RGB (H x W x 3) já
+    intercalada. com out (uint8, H x W x 3) o resultado é escrito nele,
+    sem alocar uma nova imagem.
+    """
+    return np.take(construir_lut(max_iter), iters, axis=0, out=out, mode="clip")
 
 
-def salvar(nome: str, iters: np.ndarray, max_iter: int):
-    """salva a imagem PNG a partir da matriz de iterações."""
-    rgb = colorir(iters, max_iter)
-    img = Image.fromarray(rgb, mode="RGB")
+def salvar(nome: str, iters: np.ndarray, max_iter: int, rgb: np.ndarray = None):
+    """
+    salva a imagem PNG a partir da matriz de iterações.
+    rgb é um buffer opcional para a imagem colorida, reaproveitado entre chamadas.
+    """
+    rgb = colorir(iters, max_iter, out=rgb)
+    h, w = iters.shape
+    img = Image.frombuffer("RGB", (w, h), rgb, "raw", "RGB", 0, 1)
     img.save(nome)
     print(f"  -> {nome}  ({img.width}x{img.height}, max_iter={max_iter})")
 
@@ -112,10 +147,17 @@ HEIGHT = 600
 
 def main():
     print("Caso de estudo — Fractal de Mandelbrot\n")
-    for caso in CASES:
-        print(f"[{caso['descricao']}]")
-        iters = calcular(WIDTH, HEIGHT, caso["bounds"], caso["max_iter"])
-        salvar(caso["nome"], iters, caso["max_iter"])
+    # os casos são independentes e o ctypes libera o GIL durante a chamada
+    # C++, então todos são calculados ao mesmo tempo, cada um no seu buffer;
+    # as imagens são salvas na ordem de CASES
+    buffers = [np.empty((HEIGHT, WIDTH), dtype=np.int32) for _ in CASES]
+    rgb     = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)  # salvar roda em série
+    with ThreadPoolExecutor(max_workers=min(len(CASES), os.cpu_count() or 1)) as ex:
+        futuros = [ex.submit(calcular, WIDTH, HEIGHT, caso["bounds"], caso["max_iter"], buf)
+                   for caso, buf in zip(CASES, buffers)]
+        for caso, futuro in zip(CASES, futuros):
+            print(f"[{caso['descricao']}]")
+            salvar(caso["nome"], futuro.result(), caso["max_iter"], rgb)
     print("\nConcluído.")
 
 if __name__ == "__main__":